@@ -14,8 +14,7 @@ from datetime import datetime
 
 # Import des modules locaux
 from data_fetcher import (
-    validate_tickers,
-    fetch_price_data,
+    fetch_and_validate,
     calculate_returns,
     calculate_annual_metrics
 )
@@ -27,6 +26,10 @@ from visualizations import (
     create_individual_returns_chart
 )
 
+# Fixed Monte Carlo seed: identical inputs give the identical cloud, so
+# re-running an analysis reuses the cached figures
+MONTE_CARLO_SEED = 42
+
 
 # ============================================
 # Configuration Streamlit
@@ -42,7 +45,10 @@ st.set_page_config(
 # ============================================
 # CSS GOTHAM - Defense Intelligence Interface
 # ============================================
-st.markdown("""
+@st.cache_resource
+def _gotham_css() -> str:
+    """Build the static GOTHAM stylesheet once per process."""
+    return """
 <style>
     /* ===== GOTHAM FONTS ===== */
     @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@300;400;500;600;700&family=Inter:wght@300;400;500;600;700&display=swap');
@@ -402,16 +408,19 @@ st.markdown("""
     footer {visibility: hidden;}
     header {visibility: hidden;}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+st.markdown(_gotham_css(), unsafe_allow_html=True)
 
 
 # ============================================
 # Fonctions UI Gotham
 # ============================================
-def render_terminal_header():
-    """Render the GOTHAM terminal header."""
-    now = datetime.now()
-    st.markdown(f"""
+@st.cache_resource
+def _terminal_header_template() -> str:
+    """Build the static GOTHAM terminal header markup once per process."""
+    return """
         <div class="terminal-header">
             <div class="terminal-status">
                 <div class="status-indicator">
@@ -424,9 +433,21 @@ def render_terminal_header():
                 </div>
             </div>
             <div class="terminal-title">◆ YOUN GOGER-LE GOUX</div>
-            <div class="terminal-time">{now.strftime('%Y-%m-%d')} // {now.strftime('%H:%M:%S')} UTC</div>
+            <div class="terminal-time">{timestamp}</div>
         </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+@st.fragment(run_every=1.0)
+def render_terminal_header():
+    """Render the GOTHAM terminal header; only this fragment reruns to tick the clock."""
+    now = datetime.now()
+    st.markdown(
+        _terminal_header_template().format(
+            timestamp=f"{now.strftime('%Y-%m-%d')} // {now.strftime('%H:%M:%S')} UTC"
+        ),
+        unsafe_allow_html=True
+    )
 
 
 def render_kpi_card(value: str, label: str, style: str = ""):
@@ -494,6 +515,17 @@ with st.sidebar:
     )
     
     with st.expander("ADVANCED CONFIG"):
+        engine = st.selectbox(
+            "OPTIMIZATION ENGINE",
+            ["ANALYTIC (CLOSED-FORM)", "MONTE CARLO"],
+            help="Analytic: exact two-fund solution, short positions allowed. "
+                 "Monte Carlo: sampled long-only portfolios."
+        )
+        show_simulations = st.checkbox(
+            "MONTE CARLO SCATTER",
+            value=False,
+            help="Simulate random portfolios for the efficient frontier cloud"
+        )
         n_simulations = st.number_input(
             "MONTE CARLO ITERATIONS",
             min_value=1000,
@@ -508,6 +540,11 @@ with st.sidebar:
             value=2.0,
             step=0.5
         ) / 100
+        use_shrinkage = st.checkbox(
+            "LEDOIT-WOLF SHRINKAGE",
+            value=True,
+            help="Shrink the covariance matrix for a well-conditioned estimate"
+        )
     
     st.markdown("<br>", unsafe_allow_html=True)
     run_optimization = st.button("◆ EXECUTE ANALYSIS", use_container_width=True)
@@ -535,38 +572,60 @@ if run_optimization:
             </div>
         """, unsafe_allow_html=True)
     else:
-        with st.spinner("◆ VALIDATING ASSETS..."):
-            valid_tickers, invalid_tickers = validate_tickers(tickers)
-        
-        if invalid_tickers:
-            st.markdown(f"""
-                <div class="alert-box">
-                    ⚠ INVALID TICKERS EXCLUDED: {', '.join(invalid_tickers)}
-                </div>
-            """, unsafe_allow_html=True)
-        
-        if len(valid_tickers) < 2:
-            st.markdown("""
-                <div class="alert-box">
-                    ⚠ ERROR: Insufficient valid assets. Minimum: 2
-                </div>
-            """, unsafe_allow_html=True)
-        else:
-            try:
-                with st.spinner("◆ ACQUIRING MARKET DATA..."):
-                    prices = fetch_price_data(valid_tickers, years)
+        try:
+            with st.spinner("◆ ACQUIRING MARKET DATA..."):
+                prices, valid_tickers, invalid_tickers = fetch_and_validate(tickers, years)
+            
+            if invalid_tickers:
+                st.markdown(f"""
+                    <div class="alert-box">
+                        ⚠ INVALID TICKERS EXCLUDED: {', '.join(invalid_tickers)}
+                    </div>
+                """, unsafe_allow_html=True)
+            
+            if len(valid_tickers) < 2:
+                st.markdown("""
+                    <div class="alert-box">
+                        ⚠ ERROR: Insufficient valid assets. Minimum: 2
+                    </div>
+                """, unsafe_allow_html=True)
+            else:
+                with st.spinner("◆ COMPUTING RISK METRICS..."):
                     returns = calculate_returns(prices)
-                    annual_returns, cov_matrix, corr_matrix = calculate_annual_metrics(returns)
+                    # Asset order follows the price columns
+                    annual_returns, cov_matrix, corr_matrix, assets = calculate_annual_metrics(
+                        returns,
+                        shrinkage=use_shrinkage
+                    )
                 
-                with st.spinner(f"◆ EXECUTING {n_simulations:,} SIMULATIONS..."):
-                    simulation_results, optimal_portfolios = optimize_portfolio(
+                method = 'monte_carlo' if engine == "MONTE CARLO" else 'analytic'
+                spinner_text = (
+                    f"◆ EXECUTING {n_simulations:,} SIMULATIONS..."
+                    if show_simulations or method == 'monte_carlo'
+                    else "◆ OPTIMIZING PORTFOLIO..."
+                )
+                with st.spinner(spinner_text):
+                    simulation_results, optimal_portfolios, frontier, method_used = optimize_portfolio(
                         annual_returns,
                         cov_matrix,
-                        valid_tickers,
+                        assets,
                         n_simulations,
-                        risk_free_rate
+                        risk_free_rate,
+                        method=method,
+                        simulate=show_simulations,
+                        seed=MONTE_CARLO_SEED
                     )
                 
+                # Analytic solver gave up: results come from the long-only simulation
+                if method_used != method:
+                    st.markdown("""
+                        <div class="alert-box">
+                            ⚠ ANALYTIC SOLUTION UNAVAILABLE (ILL-CONDITIONED COVARIANCE OR
+                            MINIMUM-VARIANCE RETURN ≤ RISK-FREE RATE) — SHOWING MONTE CARLO
+                            RESULTS (LONG-ONLY)
+                        </div>
+                    """, unsafe_allow_html=True)
+                
                 st.markdown("""
                     <div class="success-box">
                         ✓ ANALYSIS COMPLETE — OPTIMIZATION SUCCESSFUL
@@ -595,7 +654,8 @@ if run_optimization:
                     fig_frontier = create_efficient_frontier(
                         simulation_results,
                         optimal_portfolios,
-                        valid_tickers
+                        assets,
+                        frontier
                     )
                     st.plotly_chart(fig_frontier, use_container_width=True)
                 
@@ -603,6 +663,7 @@ if run_optimization:
                     col1, col2 = st.columns(2)
                     with col1:
                         fig_alloc_sharpe = create_allocation_chart(
+                            assets,
                             optimal_portfolios['max_sharpe']['weights'],
                             "Max Sharpe"
                         )
@@ -610,26 +671,27 @@ if run_optimization:
                     
                     with col2:
                         fig_alloc_minvol = create_allocation_chart(
+                            assets,
                             optimal_portfolios['min_volatility']['weights'],
                             "Min Variance"
                         )
                         st.plotly_chart(fig_alloc_minvol, use_container_width=True)
                 
                 with tab3:
-                    fig_corr = create_correlation_heatmap(corr_matrix)
+                    fig_corr = create_correlation_heatmap(assets, corr_matrix)
                     st.plotly_chart(fig_corr, use_container_width=True)
                 
                 with tab4:
-                    fig_returns = create_individual_returns_chart(annual_returns)
+                    fig_returns = create_individual_returns_chart(assets, annual_returns)
                     st.plotly_chart(fig_returns, use_container_width=True)
                 
                 # Weights Table
                 st.markdown('<div class="section-header">◆ ALLOCATION MATRIX</div>', unsafe_allow_html=True)
                 
                 weights_df = pd.DataFrame({
-                    'ASSET': valid_tickers,
-                    'OPTIMAL %': [optimal_portfolios['max_sharpe']['weights'][t] * 100 for t in valid_tickers],
-                    'DEFENSIVE %': [optimal_portfolios['min_volatility']['weights'][t] * 100 for t in valid_tickers]
+                    'ASSET': assets,
+                    'OPTIMAL %': optimal_portfolios['max_sharpe']['weights'] * 100,
+                    'DEFENSIVE %': optimal_portfolios['min_volatility']['weights'] * 100
                 })
                 
                 st.dataframe(
@@ -641,12 +703,12 @@ if run_optimization:
                     hide_index=True
                 )
                 
-            except Exception as e:
-                st.markdown(f"""
-                    <div class="alert-box">
-                        ⚠ SYSTEM ERROR: {str(e)}
-                    </div>
-                """, unsafe_allow_html=True)
+        except Exception as e:
+            st.markdown(f"""
+                <div class="alert-box">
+                    ⚠ SYSTEM ERROR: {str(e)}
+                </div>
+            """, unsafe_allow_html=True)
 
 else:
     st.markdown("""
@@ -681,6 +743,7 @@ with st.expander("MODERN PORTFOLIO THEORY — DOCUMENTATION"):
     | **Expected Return (μ)** | `Σ(wᵢ × rᵢ)` | Weighted average of asset returns |
     | **Volatility (σ)** | `√(w'Σw)` | Portfolio standard deviation |
     | **Sharpe Ratio** | `(μ - rf) / σ` | Risk-adjusted return measure |
+    | **Covariance (Σ)** | `(1-δ)S + δ·m·I` | Ledoit-Wolf shrinkage of the sample covariance |
     
     ---
     
@@ -691,6 +754,17 @@ with st.expander("MODERN PORTFOLIO THEORY — DOCUMENTATION"):
     
     ---
     
+    ### OPTIMIZATION ENGINES
+    
+    - **Analytic (closed-form)**: Exact solution via the two-fund theorem, every 
+      frontier portfolio is `w = f + ρ·g`. Short positions (negative weights) are allowed. 
+      Falls back to Monte Carlo (with a warning) when the covariance matrix is ill-conditioned 
+      (condition number above 1e10), when all expected returns are equal, or when the 
+      minimum-variance return does not exceed the risk-free rate.
+    - **Monte Carlo**: Random long-only portfolios; optimal points are the best samples
+    
+    ---
+    
     ### LIMITATIONS
     
     - Historical data may not predict future performance
@@ -5,55 +5,163 @@ Module pour télécharger les données de marché via yfinance
 et effectuer les calculs de rendements.
 """
 
+import hashlib
+import os
+import tempfile
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from typing import Tuple, List
+import streamlit as st
+from pathlib import Path
+from typing import Tuple, List, Optional
 from datetime import datetime, timedelta
 
 
-def validate_tickers(tickers: List[str]) -> Tuple[List[str], List[str]]:
+# Durée de vie du cache des données de marché (secondes)
+CACHE_TTL = 3600
+
+# Nombre maximal de requêtes HTTP simultanées vers yfinance
+MAX_DOWNLOAD_THREADS = 16
+
+# Cache disque des historiques de prix (partagé entre sessions et redémarrages)
+PRICE_CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+PRICE_CACHE_MAX_AGE = timedelta(days=1)
+
+
+def _hash_dataframe(df: pd.DataFrame) -> tuple:
+    """Empreinte légère d'un DataFrame de prix/rendements pour st.cache_data."""
+    if df.empty:
+        return (tuple(df.columns), 0)
+    return (tuple(df.columns), df.index[0], df.index[-1], len(df))
+
+
+def _price_cache_path(tickers: List[str], years: int) -> Path:
+    """Chemin du fichier parquet associé à (tickers, années d'historique)."""
+    key = hashlib.sha256(f"{'|'.join(sorted(tickers))}|{years}".encode()).hexdigest()
+    return PRICE_CACHE_DIR / f"{key}.parquet"
+
+
+def _is_expired(path: Path) -> bool:
+    """Vrai si le fichier de cache est plus vieux que PRICE_CACHE_MAX_AGE."""
+    age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+    return age >= PRICE_CACHE_MAX_AGE
+
+
+def _read_price_cache(path: Path) -> Optional[pd.DataFrame]:
+    """Lit un historique en cache s'il existe et n'a pas expiré."""
+    try:
+        if not _is_expired(path):
+            return pd.read_parquet(path)
+    except Exception:
+        pass
+    return None
+
+
+def _write_price_cache(path: Path, prices: pd.DataFrame) -> None:
     """
-    Valide une liste de tickers en vérifiant leur existence.
+    Écrit un historique en cache ; un échec d'écriture n'est pas bloquant.
     
-    Parameters
-    ----------
-    tickers : List[str]
-        Liste des symboles boursiers à valider
-        
-    Returns
-    -------
-    Tuple[List[str], List[str]]
-        (tickers_valides, tickers_invalides)
+    L'écriture passe par un fichier temporaire renommé atomiquement, pour
+    qu'une autre session ne lise jamais un fichier partiel. Les fichiers
+    expirés sont supprimés au passage.
     """
-    valid_tickers = []
-    invalid_tickers = []
-    
-    for ticker in tickers:
-        ticker = ticker.strip().upper()
-        if not ticker:
-            continue
-            
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
         try:
-            stock = yf.Ticker(ticker)
-            # Vérifier si des données existent
-            hist = stock.history(period="5d")
-            if hist.empty:
-                invalid_tickers.append(ticker)
-            else:
-                valid_tickers.append(ticker)
+            prices.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
         except Exception:
-            invalid_tickers.append(ticker)
+            os.unlink(tmp_path)
+            raise
+    except Exception:
+        return
+    
+    for old_path in path.parent.glob('*.parquet'):
+        try:
+            if _is_expired(old_path):
+                old_path.unlink()
+        except OSError:
+            pass
+
+
+class _NoPriceData(Exception):
+    """Aucun ticker n'a renvoyé de prix (résultat à ne pas mettre en cache)."""
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_prices(
+    tickers: Tuple[str, ...],
+    years: int
+) -> Tuple[pd.DataFrame, List[str], List[str]]:
+    """
+    Téléchargement groupé mis en cache ; voir fetch_and_validate.
+    
+    Les tickers arrivent triés, pour qu'un même univers saisi dans un autre
+    ordre partage l'entrée de cache.
+    
+    Les erreurs réseau et l'absence totale de données sont levées en
+    exceptions, que st.cache_data ne met pas en cache.
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=years * 365)
+    start = start_date.strftime('%Y-%m-%d')
+    end = end_date.strftime('%Y-%m-%d')
+    
+    # Réutiliser l'historique téléchargé il y a moins de PRICE_CACHE_MAX_AGE
+    cache_path = _price_cache_path(tickers, years)
+    prices = _read_price_cache(cache_path)
+    
+    if prices is None:
+        # Télécharger les données (une erreur réseau se propage)
+        data = yf.download(
+            list(tickers),
+            start=start,
+            end=end,
+            threads=min(MAX_DOWNLOAD_THREADS, len(tickers)),
+            progress=False,
+            auto_adjust=True
+        )
+        
+        # Extraire uniquement les prix de clôture
+        close = data['Close'] if not data.empty else pd.DataFrame()
+        if isinstance(close, pd.Series):
+            close = close.to_frame(name=tickers[0])
+        
+        # Vérifier si des données existent pour chaque ticker
+        valid_tickers = [t for t in tickers if t in close.columns and close[t].notna().any()]
+        if not valid_tickers:
+            raise _NoPriceData()
+        
+        # Supprimer les lignes avec des valeurs manquantes, stockage en float32
+        prices = close[valid_tickers].astype(np.float32).dropna()
+        
+        if prices.empty:
+            raise ValueError("Données insuffisantes après nettoyage.")
+        
+        # Cache disque seulement si tous les tickers demandés ont répondu :
+        # un échec ponctuel ne doit pas survivre au redémarrage
+        if len(valid_tickers) == len(tickers):
+            _write_price_cache(cache_path, prices)
     
-    return valid_tickers, invalid_tickers
+    valid_tickers = [t for t in tickers if t in prices.columns]
+    invalid_tickers = [t for t in tickers if t not in prices.columns]
+    
+    return prices, valid_tickers, invalid_tickers
 
 
-def fetch_price_data(
+def fetch_and_validate(
     tickers: List[str], 
     years: int = 5
-) -> pd.DataFrame:
+) -> Tuple[pd.DataFrame, List[str], List[str]]:
     """
-    Télécharge les prix de clôture ajustés pour une liste de tickers.
+    Télécharge les prix de clôture ajustés et valide les tickers en un seul appel.
+    
+    Un ticker est valide s'il possède au moins un prix dans le téléchargement
+    groupé ; aucune requête de validation séparée n'est émise. Les historiques
+    complets sont conservés sur disque (parquet) pendant un jour, sous le
+    cache mémoire de Streamlit. Un résultat vide n'est jamais mis en cache.
     
     Parameters
     ----------
@@ -64,45 +172,26 @@ def fetch_price_data(
         
     Returns
     -------
-    pd.DataFrame
-        DataFrame avec les prix de clôture ajustés (colonnes = tickers)
+    Tuple[pd.DataFrame, List[str], List[str]]
+        (prix, tickers_valides, tickers_invalides) ; les prix (float32,
+        colonnes = tickers valides) sont vides si aucun ticker n'est valide
         
     Raises
     ------
     ValueError
-        Si aucune donnée n'est disponible
+        Si les historiques des tickers valides ne se recouvrent pas
+    Exception
+        Les erreurs de téléchargement sont propagées (et non mises en cache)
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=years * 365)
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
     
-    # Télécharger les données
-    data = yf.download(
-        tickers,
-        start=start_date.strftime('%Y-%m-%d'),
-        end=end_date.strftime('%Y-%m-%d'),
-        progress=False,
-        auto_adjust=True
-    )
-    
-    if data.empty:
-        raise ValueError("Aucune donnée disponible pour les tickers spécifiés.")
-    
-    # Extraire les prix de clôture
-    if len(tickers) == 1:
-        prices = data[['Close']].copy()
-        prices.columns = tickers
-    else:
-        prices = data['Close'].copy()
-    
-    # Supprimer les lignes avec des valeurs manquantes
-    prices = prices.dropna()
-    
-    if prices.empty:
-        raise ValueError("Données insuffisantes après nettoyage.")
-    
-    return prices
+    try:
+        return _fetch_prices(tuple(sorted(tickers)), years)
+    except _NoPriceData:
+        return pd.DataFrame(), [], tickers
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, hash_funcs={pd.DataFrame: _hash_dataframe})
 def calculate_returns(prices: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les rendements logarithmiques quotidiens.
@@ -117,14 +206,55 @@ def calculate_returns(prices: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame
         Rendements logarithmiques quotidiens
     """
-    returns = np.log(prices / prices.shift(1)).dropna()
+    # log(1 + r) sur le ndarray sous-jacent : précis pour les petits rendements
+    values = prices.to_numpy(dtype=np.float64, copy=False)
+    returns = pd.DataFrame(
+        np.log1p(np.diff(values, axis=0) / values[:-1]),
+        index=prices.index[1:],
+        columns=prices.columns
+    )
     return returns
 
 
+def _ledoit_wolf_covariance(Xc: np.ndarray) -> np.ndarray:
+    """
+    Estimateur de covariance de Ledoit-Wolf (cible : identité mise à l'échelle).
+    
+    Parameters
+    ----------
+    Xc : np.ndarray
+        Rendements centrés (observations × actifs)
+        
+    Returns
+    -------
+    np.ndarray
+        Covariance rétrécie, bien conditionnée même si actifs ≥ observations
+    """
+    n_samples, n_features = Xc.shape
+    
+    emp_cov = (Xc.T @ Xc) / n_samples
+    mu = np.trace(emp_cov) / n_features
+    
+    # Intensité optimale de rétrécissement (Ledoit & Wolf, 2004)
+    X2 = Xc ** 2
+    beta_ = np.sum(X2.T @ X2) / n_samples
+    delta_ = np.sum(emp_cov ** 2)
+    beta = (beta_ - delta_) / (n_features * n_samples)
+    delta = (delta_ - 2 * mu * np.trace(emp_cov) + n_features * mu ** 2) / n_features
+    beta = min(beta, delta)
+    shrinkage = 0.0 if beta == 0 else beta / delta
+    
+    shrunk_cov = (1 - shrinkage) * emp_cov
+    shrunk_cov.flat[::n_features + 1] += shrinkage * mu
+    return shrunk_cov
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, hash_funcs={pd.DataFrame: _hash_dataframe})
 def calculate_annual_metrics(
     returns: pd.DataFrame, 
-    trading_days: int = 252
-) -> Tuple[pd.Series, pd.DataFrame, pd.DataFrame]:
+    trading_days: int = 252,
+    shrinkage: bool = True
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
     """
     Calcule les métriques annualisées.
     
@@ -134,19 +264,35 @@ def calculate_annual_metrics(
         Rendements logarithmiques quotidiens
     trading_days : int
         Nombre de jours de trading par an
+    shrinkage : bool
+        Rétrécir la covariance par Ledoit-Wolf (la corrélation affichée
+        reste la corrélation empirique)
         
     Returns
     -------
-    Tuple[pd.Series, pd.DataFrame, pd.DataFrame]
-        (rendements_annuels, matrice_covariance, matrice_correlation)
+    Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]
+        (rendements_annuels, matrice_covariance, matrice_correlation, tickers),
+        tableaux float64 contigus alignés sur tickers
     """
+    X = returns.to_numpy(dtype=np.float64)
+    tickers = returns.columns.tolist()
+    
     # Rendements annuels moyens
-    annual_returns = returns.mean() * trading_days
+    means = X.mean(axis=0)
+    annual_returns = means * trading_days
     
-    # Matrice de covariance annualisée
-    cov_matrix = returns.cov() * trading_days
+    # Covariance et corrélation dérivées d'un seul produit matriciel centré
+    Xc = X - means
+    sample_cov = (Xc.T @ Xc) / (len(X) - 1)
+    sigma = np.sqrt(np.diag(sample_cov))
     
     # Matrice de corrélation
-    corr_matrix = returns.corr()
+    corr_matrix = sample_cov / np.outer(sigma, sigma)
+    
+    # Matrice de covariance annualisée
+    if shrinkage:
+        cov_matrix = _ledoit_wolf_covariance(Xc) * trading_days
+    else:
+        cov_matrix = sample_cov * trading_days
     
-    return annual_returns, cov_matrix, corr_matrix
+    return annual_returns, cov_matrix, corr_matrix, tickers
@@ -5,11 +5,43 @@ Module d'optimisation de portefeuille basé sur la Théorie Moderne de Markowitz
 Génère des simulations Monte Carlo et identifie les portefeuilles optimaux.
 """
 
+import threading
 import numpy as np
-import pandas as pd
-from typing import Dict, Tuple, NamedTuple
+from scipy.linalg.blas import get_blas_funcs
+from typing import Dict, Tuple, NamedTuple, Optional, Union
 from dataclasses import dataclass
 
+# Numba est optionnel : sans lui, la simulation reste en Python pur
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Streamlit exécute chaque session dans son propre thread : le noyau parallèle
+# Numba ne doit pas être lancé en concurrence (la couche « workqueue » abat
+# alors le processus entier)
+_NUMBA_LOCK = threading.Lock()
+
+# CuPy est optionnel : backend GPU de la simulation Monte Carlo
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    CUPY_AVAILABLE = False
+
+# Produit par une matrice triangulaire (BLAS strmm), pour W·L en float32
+_trmm = get_blas_funcs('trmm', dtype=np.float32)
+
+# Taille des blocs de la simulation Monte Carlo (poids tirés par bloc)
+MC_CHUNK_SIZE = 4096
+
+# Nombre maximal de points Monte Carlo conservés pour le nuage affiché
+MC_MAX_POINTS = 20000
+
+# Conditionnement maximal de Σ accepté par la solution analytique
+MAX_CONDITION_NUMBER = 1e10
+
 
 @dataclass
 class PortfolioResult:
@@ -20,193 +52,646 @@ class PortfolioResult:
     sharpe_ratio: float
 
 
-class SimulationResults(NamedTuple):
-    """Résultats des simulations Monte Carlo."""
+@dataclass
+class SimulationResults:
+    """
+    Résultats des simulations Monte Carlo : nuage (éventuellement
+    sous-échantillonné) et poids/métriques (rendement, volatilité, Sharpe)
+    des seuls gagnants.
+    
+    Les métriques du nuage partagent un seul bloc contigu (n_points, 3) ;
+    returns, volatilities et sharpe_ratios en sont des vues sans copie.
+    """
+    __slots__ = (
+        'metrics',
+        'max_sharpe_weights',
+        'max_sharpe_metrics',
+        'min_vol_weights',
+        'min_vol_metrics'
+    )
+    metrics: np.ndarray
+    max_sharpe_weights: np.ndarray
+    max_sharpe_metrics: np.ndarray
+    min_vol_weights: np.ndarray
+    min_vol_metrics: np.ndarray
+    
+    @property
+    def returns(self) -> np.ndarray:
+        """Rendements attendus du nuage."""
+        return self.metrics[:, 0]
+    
+    @property
+    def volatilities(self) -> np.ndarray:
+        """Volatilités du nuage."""
+        return self.metrics[:, 1]
+    
+    @property
+    def sharpe_ratios(self) -> np.ndarray:
+        """Ratios de Sharpe du nuage."""
+        return self.metrics[:, 2]
+
+
+class FrontierResults(NamedTuple):
+    """Frontière efficiente analytique (branche supérieure)."""
     returns: np.ndarray
     volatilities: np.ndarray
-    sharpe_ratios: np.ndarray
     all_weights: np.ndarray
 
 
-def generate_random_weights(n_assets: int) -> np.ndarray:
+def generate_random_weights(
+    n_assets: int,
+    size: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+    dtype: type = np.float64
+) -> np.ndarray:
     """
-    Génère des poids aléatoires normalisés pour un portefeuille.
+    Génère des poids aléatoires normalisés pour un ou plusieurs portefeuilles.
     
     Parameters
     ----------
     n_assets : int
         Nombre d'actifs dans le portefeuille
+    size : Optional[int]
+        Nombre de portefeuilles tirés en un seul appel (défaut : un seul)
+    rng : Optional[np.random.Generator]
+        Générateur à utiliser (défaut : nouveau Generator PCG64)
+    dtype : type
+        np.float64 ou np.float32
         
     Returns
     -------
     np.ndarray
-        Poids normalisés (somme = 1)
+        Poids normalisés (somme = 1), (n_assets,) ou (size, n_assets)
     """
-    weights = np.random.random(n_assets)
-    weights /= weights.sum()
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    # Un seul tirage contigu, normalisé ligne par ligne
+    shape = (n_assets,) if size is None else (size, n_assets)
+    weights = rng.random(shape, dtype=dtype)
+    weights /= weights.sum(axis=-1, keepdims=True)
     return weights
 
 
+def _portfolio_metrics(
+    weights: np.ndarray,
+    mu: np.ndarray,
+    cov: np.ndarray,
+    risk_free_rate: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cœur de calcul sur ndarrays float64 contigus, sans conversion."""
+    # Rendement attendu du portefeuille
+    portfolio_return = weights @ mu
+    
+    # Volatilité du portefeuille (écart-type) : wᵀΣw ligne à ligne après un seul GEMM
+    portfolio_volatility = np.sqrt(
+        np.einsum('...i,...i->...', weights @ cov, weights)
+    )
+    
+    # Ratio de Sharpe
+    sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_volatility
+    
+    return portfolio_return, portfolio_volatility, sharpe_ratio
+
+
 def calculate_portfolio_metrics(
     weights: np.ndarray,
-    annual_returns: pd.Series,
-    cov_matrix: pd.DataFrame,
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
     risk_free_rate: float = 0.02
-) -> Tuple[float, float, float]:
+) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray], Union[float, np.ndarray]]:
     """
-    Calcule les métriques d'un portefeuille.
+    Calcule les métriques d'un portefeuille ou d'un lot de portefeuilles.
+    
+    Accepte aussi des objets pandas, convertis une seule fois en ndarrays.
     
     Parameters
     ----------
     weights : np.ndarray
-        Poids des actifs
-    annual_returns : pd.Series
+        Poids des actifs, (n_assets,) ou (n_portefeuilles, n_assets)
+    annual_returns : np.ndarray
         Rendements annuels attendus
-    cov_matrix : pd.DataFrame
+    cov_matrix : np.ndarray
         Matrice de covariance annualisée
     risk_free_rate : float
         Taux sans risque (défaut: 2%)
         
     Returns
     -------
-    Tuple[float, float, float]
-        (rendement_attendu, volatilité, ratio_sharpe)
+    Tuple[Union[float, np.ndarray], Union[float, np.ndarray], Union[float, np.ndarray]]
+        (rendement_attendu, volatilité, ratio_sharpe), scalaires ou
+        tableaux (n_portefeuilles,) pour un lot
     """
-    # Rendement attendu du portefeuille
-    portfolio_return = np.dot(weights, annual_returns)
-    
-    # Volatilité du portefeuille (écart-type)
-    portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
+    return _portfolio_metrics(
+        np.asarray(weights, dtype=np.float64),
+        np.ascontiguousarray(annual_returns, dtype=np.float64),
+        np.ascontiguousarray(cov_matrix, dtype=np.float64),
+        risk_free_rate
+    )
+
+
+def _cholesky_factor(cov: np.ndarray) -> np.ndarray:
+    """
+    Facteur de Cholesky triangulaire inférieur de Σ.
     
-    # Ratio de Sharpe
-    sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_volatility
+    Si Σ n'est pas numériquement définie positive, une régularisation
+    diagonale croissante (à partir de 1e-12 × variance moyenne) est ajoutée.
+    """
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        pass
     
-    return portfolio_return, portfolio_volatility, sharpe_ratio
+    eye = np.eye(cov.shape[0])
+    scale = max(np.trace(cov) / cov.shape[0], 1e-12)
+    for exponent in range(-12, -1):
+        try:
+            return np.linalg.cholesky(cov + scale * 10.0 ** exponent * eye)
+        except np.linalg.LinAlgError:
+            continue
+    raise ValueError("Matrice de covariance non définie positive.")
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _simulate_numba(
+        mu: np.ndarray,
+        L: np.ndarray,
+        risk_free_rate: float,
+        all_weights: np.ndarray,
+        out_returns: np.ndarray,
+        out_volatilities: np.ndarray,
+        out_sharpe: np.ndarray
+    ) -> None:
+        """
+        Noyau Monte Carlo compilé : normalise sur place les poids déjà tirés
+        et calcule rendement, volatilité et Sharpe de chaque portefeuille en
+        parallèle, avec wᵀΣw = ||Lᵀw||² évalué sur le seul triangle
+        inférieur de L.
+        
+        Les résultats sont écrits dans les tampons préalloués out_*.
+        """
+        n_simulations, n_assets = all_weights.shape
+        
+        for i in prange(n_simulations):
+            weights = all_weights[i]
+            total = 0.0
+            for k in range(n_assets):
+                total += weights[k]
+            
+            for k in range(n_assets):
+                weights[k] /= total
+            
+            ret = 0.0
+            var = 0.0
+            for k in range(n_assets):
+                ret += weights[k] * mu[k]
+                acc = 0.0
+                for j in range(k, n_assets):
+                    acc += weights[j] * L[j, k]
+                var += acc * acc
+            
+            vol = np.sqrt(var)
+            out_returns[i] = ret
+            out_volatilities[i] = vol
+            out_sharpe[i] = (ret - risk_free_rate) / vol
+
+
+def _check_backend(backend: str) -> None:
+    """Valide le backend de calcul Monte Carlo ('numpy' ou 'cupy')."""
+    if backend not in ('numpy', 'cupy'):
+        raise ValueError(f"Backend de calcul inconnu : {backend}")
+    if backend == 'cupy' and not CUPY_AVAILABLE:
+        raise ImportError("Le backend 'cupy' requiert CuPy (pip install cupy).")
+
+
+def _select_optimal_indices_numpy(
+    sharpe_ratios: np.ndarray,
+    volatilities: np.ndarray
+) -> Tuple[int, int]:
+    """Indices du Sharpe maximal et de la volatilité minimale."""
+    return int(np.argmax(sharpe_ratios)), int(np.argmin(volatilities))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _select_optimal_indices(
+        sharpe_ratios: np.ndarray,
+        volatilities: np.ndarray
+    ) -> Tuple[int, int]:
+        """
+        Indices du Sharpe maximal et de la volatilité minimale, calculés
+        en une seule passe sans allocation.
+        """
+        max_sharpe_idx = 0
+        min_vol_idx = 0
+        best_sharpe = sharpe_ratios[0]
+        min_vol = volatilities[0]
+        
+        for i in range(1, sharpe_ratios.shape[0]):
+            if sharpe_ratios[i] > best_sharpe:
+                best_sharpe = sharpe_ratios[i]
+                max_sharpe_idx = i
+            if volatilities[i] < min_vol:
+                min_vol = volatilities[i]
+                min_vol_idx = i
+        
+        return max_sharpe_idx, min_vol_idx
+else:
+    _select_optimal_indices = _select_optimal_indices_numpy
 
 
 def run_monte_carlo_simulation(
-    annual_returns: pd.Series,
-    cov_matrix: pd.DataFrame,
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
     n_simulations: int = 5000,
-    risk_free_rate: float = 0.02
+    risk_free_rate: float = 0.02,
+    chunk_size: int = MC_CHUNK_SIZE,
+    max_points: int = MC_MAX_POINTS,
+    backend: str = 'numpy',
+    seed: Optional[int] = None
 ) -> SimulationResults:
     """
     Exécute une simulation Monte Carlo pour générer des portefeuilles aléatoires.
     
+    L'ensemble est calculé en float32 : l'erreur d'arrondi par échantillon
+    (~1e-7) est négligeable devant le bruit Monte Carlo (~1/√N). Les
+    portefeuilles sont traités par blocs dans des tampons réutilisés, si bien
+    que la mémoire ne croît pas avec n_simulations au-delà du nuage conservé.
+    
     Parameters
     ----------
-    annual_returns : pd.Series
+    annual_returns : np.ndarray
         Rendements annuels attendus par actif
-    cov_matrix : pd.DataFrame
+    cov_matrix : np.ndarray
         Matrice de covariance annualisée
     n_simulations : int
         Nombre de simulations à exécuter
     risk_free_rate : float
         Taux sans risque
+    chunk_size : int
+        Nombre de portefeuilles tirés par bloc
+    max_points : int
+        Nombre maximal de points conservés pour le nuage (un échantillon
+        sur k au-delà)
+    backend : str
+        'numpy' (CPU, noyau Numba si disponible) ou 'cupy' (GPU)
+    seed : Optional[int]
+        Graine du générateur, pour des tirages reproductibles
         
     Returns
     -------
     SimulationResults
-        Résultats de toutes les simulations
+        Résultats des simulations (float32)
     """
+    _check_backend(backend)
     n_assets = len(annual_returns)
+    mu = np.ascontiguousarray(annual_returns, dtype=np.float32)
+    cov = np.ascontiguousarray(cov_matrix, dtype=np.float64)
     
-    # Arrays pour stocker les résultats
-    all_returns = np.zeros(n_simulations)
-    all_volatilities = np.zeros(n_simulations)
-    all_sharpe = np.zeros(n_simulations)
-    all_weights = np.zeros((n_simulations, n_assets))
-    
-    # Exécuter les simulations
-    for i in range(n_simulations):
-        weights = generate_random_weights(n_assets)
-        ret, vol, sharpe = calculate_portfolio_metrics(
-            weights, annual_returns, cov_matrix, risk_free_rate
-        )
+    # Σ = L·Lᵀ factorisée une fois (en float64) pour toutes les simulations : wᵀΣw = ||Lᵀw||²
+    # L en ordre Fortran : colonnes contiguës pour le noyau et pour BLAS
+    L = np.asfortranarray(_cholesky_factor(cov), dtype=np.float32)
+    
+    if backend == 'cupy':
+        # μ et L copiés une fois sur le GPU ; les poids n'en sortent jamais
+        mu_gpu = cp.asarray(mu)
+        L_gpu = cp.asarray(L)
+        rng = cp.random.default_rng(seed)
+    else:
+        # Un seul Generator PCG64 dédié, utilisé sur le thread principal
+        rng = np.random.default_rng(seed)
+    
+    # Nuage conservé : un échantillon sur `stride` au-delà de max_points
+    stride = max(1, -(-n_simulations // max_points))
+    n_stored = len(range(0, n_simulations, stride))
+    all_metrics = np.empty((n_stored, 3), dtype=np.float32)
+    
+    # Tampons de bloc alloués une fois et réutilisés à chaque itération ;
+    # sur GPU, les poids restent dans des tableaux CuPy (pas de tampon hôte)
+    chunk_size = max(1, min(chunk_size, n_simulations))
+    if backend != 'cupy':
+        chunk_weights = np.empty((chunk_size, n_assets), dtype=np.float32)
+    chunk_returns = np.empty(chunk_size, dtype=np.float32)
+    chunk_volatilities = np.empty(chunk_size, dtype=np.float32)
+    chunk_sharpe = np.empty(chunk_size, dtype=np.float32)
+    
+    # Seules les lignes gagnantes sont conservées : pas de matrice (N, n_assets)
+    max_sharpe_weights = min_vol_weights = None
+    max_sharpe_metrics = min_vol_metrics = None
+    best_sharpe, best_vol = -np.inf, np.inf
+    _to_host = cp.asnumpy if backend == 'cupy' else np.copy
+    
+    for start in range(0, n_simulations, chunk_size):
+        n = min(chunk_size, n_simulations - start)
+        returns = chunk_returns[:n]
+        volatilities = chunk_volatilities[:n]
+        sharpe_ratios = chunk_sharpe[:n]
+        
+        if backend == 'cupy':
+            # Bloc tiré et évalué sur GPU (cuBLAS) : seules les réductions
+            # reviennent sur l'hôte
+            weights = rng.random((n, n_assets), dtype=cp.float32)
+            weights /= weights.sum(axis=1, keepdims=True)
+            returns[:] = cp.asnumpy(weights @ mu_gpu)
+            volatilities[:] = cp.asnumpy(cp.linalg.norm(weights @ L_gpu, axis=1))
+            np.divide(returns - risk_free_rate, volatilities, out=sharpe_ratios)
+        elif NUMBA_AVAILABLE:
+            weights = chunk_weights[:n]
+            
+            # Poids tirés sur le thread principal par le Generator ; le noyau
+            # compilé ne fait que normaliser et calculer les métriques
+            rng.random(out=weights, dtype=np.float32)
+            with _NUMBA_LOCK:
+                _simulate_numba(
+                    mu, L, risk_free_rate,
+                    weights, returns, volatilities, sharpe_ratios
+                )
+        else:
+            # Poids du bloc tirés sur place (Generator PCG64)
+            weights = chunk_weights[:n]
+            rng.random(out=weights, dtype=np.float32)
+            weights /= weights.sum(axis=1, keepdims=True)
+            np.matmul(weights, mu, out=returns)
+            
+            # (W·L)ᵀ = Lᵀ·Wᵀ par TRMM (moitié des flops d'un GEMM). TRMM copie
+            # Wᵀ dans Y : ne pas passer overwrite_b=1, les lignes gagnantes de
+            # weights sont relues après l'appel
+            Y = _trmm(1.0, L, weights.T, lower=1, trans_a=1)
+            
+            # Carré, somme et racine fusionnés dans les tampons du bloc, sans
+            # temporaire (n_assets, bloc) supplémentaire
+            np.sqrt(np.einsum('ij,ij->j', Y, Y), out=volatilities)
+            np.subtract(returns, risk_free_rate, out=sharpe_ratios)
+            sharpe_ratios /= volatilities
         
-        all_returns[i] = ret
-        all_volatilities[i] = vol
-        all_sharpe[i] = sharpe
-        all_weights[i] = weights
+        # Meilleurs portefeuilles du bloc comparés aux meilleurs courants
+        i_sharpe, i_vol = _select_optimal_indices(sharpe_ratios, volatilities)
+        if sharpe_ratios[i_sharpe] > best_sharpe:
+            best_sharpe = sharpe_ratios[i_sharpe]
+            max_sharpe_weights = _to_host(weights[i_sharpe])
+            max_sharpe_metrics = np.array(
+                [returns[i_sharpe], volatilities[i_sharpe], sharpe_ratios[i_sharpe]]
+            )
+        if volatilities[i_vol] < best_vol:
+            best_vol = volatilities[i_vol]
+            min_vol_weights = _to_host(weights[i_vol])
+            min_vol_metrics = np.array(
+                [returns[i_vol], volatilities[i_vol], sharpe_ratios[i_vol]]
+            )
+        
+        # Échantillons d'indice global multiple de stride versés dans le nuage
+        first = -start % stride
+        kept = slice(first, n, stride)
+        offset = (start + first) // stride
+        dest = slice(offset, offset + len(range(first, n, stride)))
+        all_metrics[dest, 0] = returns[kept]
+        all_metrics[dest, 1] = volatilities[kept]
+        all_metrics[dest, 2] = sharpe_ratios[kept]
     
     return SimulationResults(
-        returns=all_returns,
-        volatilities=all_volatilities,
-        sharpe_ratios=all_sharpe,
-        all_weights=all_weights
+        metrics=all_metrics,
+        max_sharpe_weights=max_sharpe_weights,
+        max_sharpe_metrics=max_sharpe_metrics,
+        min_vol_weights=min_vol_weights,
+        min_vol_metrics=min_vol_metrics
     )
 
 
 def find_optimal_portfolios(
     simulation_results: SimulationResults,
-    annual_returns: pd.Series,
-    cov_matrix: pd.DataFrame,
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
     tickers: list,
     risk_free_rate: float = 0.02
 ) -> Dict[str, Dict]:
     """
     Identifie les portefeuilles optimaux à partir des simulations.
     
+    Les gagnants sont sélectionnés pendant la simulation ; annual_returns,
+    cov_matrix, tickers et risk_free_rate ne sont plus utilisés et sont
+    conservés uniquement pour la compatibilité de l'API.
+    
     Parameters
     ----------
     simulation_results : SimulationResults
         Résultats des simulations Monte Carlo
-    annual_returns : pd.Series
-        Rendements annuels attendus
-    cov_matrix : pd.DataFrame
-        Matrice de covariance
+    annual_returns : np.ndarray
+        Rendements annuels attendus (inutilisé)
+    cov_matrix : np.ndarray
+        Matrice de covariance (inutilisé)
     tickers : list
-        Liste des symboles
+        Liste des symboles (inutilisé)
     risk_free_rate : float
-        Taux sans risque
+        Taux sans risque (inutilisé)
         
     Returns
     -------
     Dict[str, Dict]
-        Dictionnaire contenant les portefeuilles 'max_sharpe' et 'min_volatility'
+        Dictionnaire contenant les portefeuilles 'max_sharpe' et 'min_volatility' ;
+        'weights' est un np.ndarray aligné sur tickers ; les valeurs sont
+        reconverties en float64
     """
+    # Gagnants déjà sélectionnés pendant la simulation
     results = {}
     
     # Portefeuille à Ratio de Sharpe Maximum
-    max_sharpe_idx = np.argmax(simulation_results.sharpe_ratios)
-    max_sharpe_weights = simulation_results.all_weights[max_sharpe_idx]
+    ret, vol, sharpe = simulation_results.max_sharpe_metrics
     
     results['max_sharpe'] = {
-        'weights': dict(zip(tickers, max_sharpe_weights)),
-        'return': simulation_results.returns[max_sharpe_idx],
-        'volatility': simulation_results.volatilities[max_sharpe_idx],
-        'sharpe': simulation_results.sharpe_ratios[max_sharpe_idx]
+        'weights': simulation_results.max_sharpe_weights.astype(np.float64),
+        'return': float(ret),
+        'volatility': float(vol),
+        'sharpe': float(sharpe)
     }
     
     # Portefeuille à Variance Minimale
-    min_vol_idx = np.argmin(simulation_results.volatilities)
-    min_vol_weights = simulation_results.all_weights[min_vol_idx]
+    ret, vol, sharpe = simulation_results.min_vol_metrics
     
     results['min_volatility'] = {
-        'weights': dict(zip(tickers, min_vol_weights)),
-        'return': simulation_results.returns[min_vol_idx],
-        'volatility': simulation_results.volatilities[min_vol_idx],
-        'sharpe': simulation_results.sharpe_ratios[min_vol_idx]
+        'weights': simulation_results.min_vol_weights.astype(np.float64),
+        'return': float(ret),
+        'volatility': float(vol),
+        'sharpe': float(sharpe)
     }
     
     return results
 
 
+def _two_fund_coefficients(
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray
+) -> Optional[Tuple[np.ndarray, np.ndarray, float, float, float]]:
+    """
+    Calcule les deux fonds générateurs de la frontière de Markowitz.
+    
+    Tout portefeuille de la frontière de rendement attendu ρ s'écrit
+    w = f + ρ·g (ventes à découvert autorisées).
+    
+    Parameters
+    ----------
+    annual_returns : np.ndarray
+        Rendements annuels attendus
+    cov_matrix : np.ndarray
+        Matrice de covariance annualisée
+        
+    Returns
+    -------
+    Optional[Tuple[np.ndarray, np.ndarray, float, float, float]]
+        (f, g, a11, a12, a22) avec a11 = 1ᵀQ1, a12 = rᵀQ1, a22 = rᵀQr, Q = Σ⁻¹,
+        ou None si Σ est mal conditionnée (covariance de rang déficient) ou
+        si la frontière est dégénérée (rendements attendus identiques)
+    """
+    # Σ⁻¹ n'a de sens que si Σ est définie positive et bien conditionnée
+    eigenvalues = np.linalg.eigvalsh(cov_matrix)
+    if eigenvalues[0] <= eigenvalues[-1] / MAX_CONDITION_NUMBER:
+        return None
+    
+    r = annual_returns
+    ones = np.ones_like(r)
+    
+    # Q·1 et Q·r en une seule résolution, sans inverser Σ explicitement
+    Q_u, Q_r = np.linalg.solve(cov_matrix, np.column_stack([ones, r])).T
+    
+    a11 = ones @ Q_u
+    a12 = r @ Q_u
+    a22 = r @ Q_r
+    d = a11 * a22 - a12 ** 2
+    
+    if d <= 1e-12 * a11 * a22:
+        return None
+    
+    f = (a22 * Q_u - a12 * Q_r) / d
+    g = (a11 * Q_r - a12 * Q_u) / d
+    
+    return f, g, a11, a12, a22
+
+
+def compute_efficient_frontier(
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    n_points: int = 100,
+    risk_free_rate: float = 0.02
+) -> Optional[FrontierResults]:
+    """
+    Calcule la frontière efficiente exacte par le théorème des deux fonds.
+    
+    Parameters
+    ----------
+    annual_returns : np.ndarray
+        Rendements annuels attendus
+    cov_matrix : np.ndarray
+        Matrice de covariance annualisée
+    n_points : int
+        Nombre de points de la frontière
+    risk_free_rate : float
+        Taux sans risque (borne le tracé au-delà du portefeuille tangent)
+        
+    Returns
+    -------
+    Optional[FrontierResults]
+        Points de la frontière, du portefeuille de variance minimale
+        jusqu'au plus haut rendement pertinent, ou None si la solution
+        analytique n'est pas fiable (voir _two_fund_coefficients)
+    """
+    coefficients = _two_fund_coefficients(annual_returns, cov_matrix)
+    if coefficients is None:
+        return None
+    f, g, a11, a12, a22 = coefficients
+    d = a11 * a22 - a12 ** 2
+    
+    # De la variance minimale au rendement maximal (actif ou portefeuille tangent)
+    rho_min = a12 / a11
+    rho_max = np.max(annual_returns)
+    if a12 - risk_free_rate * a11 > 0:
+        rho_max = max(rho_max, (a22 - risk_free_rate * a12) / (a12 - risk_free_rate * a11))
+    rho_max = max(rho_max, rho_min)
+    rho_grid = np.linspace(rho_min, rho_max, n_points)
+    
+    # Tous les poids en une opération : W = f + ρ·g
+    all_weights = f[None, :] + rho_grid[:, None] * g[None, :]
+    variances = (a11 * rho_grid ** 2 - 2 * a12 * rho_grid + a22) / d
+    
+    return FrontierResults(
+        returns=rho_grid,
+        volatilities=np.sqrt(np.maximum(variances, 0.0)),
+        all_weights=all_weights
+    )
+
+
+def find_analytic_portfolios(
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    risk_free_rate: float = 0.02
+) -> Optional[Dict[str, Dict]]:
+    """
+    Calcule les portefeuilles optimaux en forme fermée (ventes à découvert autorisées).
+    
+    Parameters
+    ----------
+    annual_returns : np.ndarray
+        Rendements annuels attendus
+    cov_matrix : np.ndarray
+        Matrice de covariance annualisée
+    risk_free_rate : float
+        Taux sans risque
+        
+    Returns
+    -------
+    Optional[Dict[str, Dict]]
+        Portefeuilles 'max_sharpe' et 'min_volatility' ('weights' aligné
+        sur annual_returns), ou None si le portefeuille tangent n'existe pas
+        (rendement du portefeuille de variance minimale inférieur ou égal
+        au taux sans risque) ou si la solution analytique n'est pas fiable
+    """
+    coefficients = _two_fund_coefficients(annual_returns, cov_matrix)
+    if coefficients is None:
+        return None
+    f, g, a11, a12, a22 = coefficients
+    
+    excess = a12 - risk_free_rate * a11
+    if excess <= 0:
+        return None
+    
+    # Les deux portefeuilles évalués en un seul lot : W = f + ρ·g
+    names = ['max_sharpe', 'min_volatility']
+    rhos = np.array([(a22 - risk_free_rate * a12) / excess, a12 / a11])
+    all_weights = f[None, :] + rhos[:, None] * g[None, :]
+    rets, vols, sharpes = _portfolio_metrics(
+        all_weights, annual_returns, cov_matrix, risk_free_rate
+    )
+    
+    results = {}
+    for i, name in enumerate(names):
+        results[name] = {
+            'weights': all_weights[i],
+            'return': rets[i],
+            'volatility': vols[i],
+            'sharpe': sharpes[i]
+        }
+    
+    return results
+
+
 def optimize_portfolio(
-    annual_returns: pd.Series,
-    cov_matrix: pd.DataFrame,
+    annual_returns: np.ndarray,
+    cov_matrix: np.ndarray,
     tickers: list,
     n_simulations: int = 5000,
-    risk_free_rate: float = 0.02
-) -> Tuple[SimulationResults, Dict[str, Dict]]:
+    risk_free_rate: float = 0.02,
+    method: str = 'analytic',
+    simulate: bool = False,
+    backend: str = 'numpy',
+    seed: Optional[int] = None
+) -> Tuple[Optional[SimulationResults], Dict[str, Dict], Optional[FrontierResults], str]:
     """
     Fonction principale d'optimisation de portefeuille.
     
     Parameters
     ----------
-    annual_returns : pd.Series
+    annual_returns : np.ndarray
         Rendements annuels attendus
-    cov_matrix : pd.DataFrame
+    cov_matrix : np.ndarray
         Matrice de covariance annualisée
     tickers : list
         Liste des symboles boursiers
@@ -214,27 +699,77 @@ def optimize_portfolio(
         Nombre de simulations Monte Carlo
     risk_free_rate : float
         Taux sans risque
+    method : str
+        'analytic' (forme fermée, ventes à découvert autorisées) ou
+        'monte_carlo' (échantillonnage, positions longues uniquement)
+    simulate : bool
+        Lancer aussi la simulation Monte Carlo pour le nuage de points
+        (désactivé par défaut) ; toujours lancée avec 'monte_carlo' ou si
+        la solution analytique n'existe pas
+    backend : str
+        Backend de la simulation Monte Carlo : 'numpy' (CPU) ou 'cupy' (GPU)
+    seed : Optional[int]
+        Graine de la simulation Monte Carlo (tirages reproductibles)
         
     Returns
     -------
-    Tuple[SimulationResults, Dict[str, Dict]]
-        (résultats_simulations, portefeuilles_optimaux)
-    """
-    # Lancer les simulations
-    simulation_results = run_monte_carlo_simulation(
-        annual_returns, 
-        cov_matrix, 
-        n_simulations, 
-        risk_free_rate
-    )
+    Tuple[Optional[SimulationResults], Dict[str, Dict], Optional[FrontierResults], str]
+        (résultats_simulations, portefeuilles_optimaux, frontière_analytique,
+        méthode_utilisée) ; la méthode utilisée vaut 'monte_carlo' en cas de
+        repli, et la frontière analytique est alors None
+    """
+    if method not in ('analytic', 'monte_carlo'):
+        raise ValueError(f"Méthode d'optimisation inconnue : {method}")
+    _check_backend(backend)
+    
+    # Conversion unique en ndarrays float64 contigus, partagés par tous les calculs
+    annual_returns = np.ascontiguousarray(annual_returns, dtype=np.float64)
+    cov_matrix = np.ascontiguousarray(cov_matrix, dtype=np.float64)
+    
+    simulation_results = None
+    optimal_portfolios = None
+    frontier = None
+    
+    # Solution exacte par le théorème des deux fonds
+    if method == 'analytic':
+        frontier = compute_efficient_frontier(
+            annual_returns,
+            cov_matrix,
+            risk_free_rate=risk_free_rate
+        )
+        # Σ mal conditionnée ou frontière dégénérée : repli Monte Carlo
+        if frontier is not None:
+            optimal_portfolios = find_analytic_portfolios(
+                annual_returns,
+                cov_matrix,
+                risk_free_rate
+            )
+    
+    # Repli Monte Carlo : la courbe analytique (ventes à découvert) ne
+    # correspond pas aux portefeuilles échantillonnés (positions longues)
+    method_used = method if optimal_portfolios is not None else 'monte_carlo'
+    if method_used == 'monte_carlo':
+        frontier = None
+    
+    # Lancer les simulations (nuage de points ou repli Monte Carlo)
+    if simulate or method_used == 'monte_carlo':
+        simulation_results = run_monte_carlo_simulation(
+            annual_returns, 
+            cov_matrix, 
+            n_simulations, 
+            risk_free_rate,
+            backend=backend,
+            seed=seed
+        )
     
     # Trouver les portefeuilles optimaux
-    optimal_portfolios = find_optimal_portfolios(
-        simulation_results,
-        annual_returns,
-        cov_matrix,
-        tickers,
-        risk_free_rate
-    )
+    if optimal_portfolios is None:
+        optimal_portfolios = find_optimal_portfolios(
+            simulation_results,
+            annual_returns,
+            cov_matrix,
+            tickers,
+            risk_free_rate
+        )
     
-    return simulation_results, optimal_portfolios
+    return simulation_results, optimal_portfolios, frontier, method_used
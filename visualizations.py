@@ -5,10 +5,11 @@ Graphiques interactifs Plotly pour l'optimisation de portefeuille.
 Style "Defense Intelligence Interface" - Palantir Gotham.
 """
 
+import hashlib
 import plotly.graph_objects as go
 import plotly.express as px
-import pandas as pd
 import numpy as np
+import streamlit as st
 from typing import Dict
 
 
@@ -28,64 +29,167 @@ GOTHAM = {
 }
 
 
-def _get_gotham_layout():
-    """Base layout configuration for Gotham theme."""
-    return dict(
-        plot_bgcolor=GOTHAM['bg_primary'],
-        paper_bgcolor=GOTHAM['bg_secondary'],
-        font=dict(
-            family="JetBrains Mono, Roboto Mono, monospace",
-            color=GOTHAM['text_primary'],
-            size=11
-        ),
-        margin=dict(l=50, r=30, t=60, b=50),
-    )
+def _hash_array(array: np.ndarray) -> tuple:
+    """Empreinte d'un tableau NumPy pour le cache des figures."""
+    digest = hashlib.blake2b(np.ascontiguousarray(array).data, digest_size=16).digest()
+    return (array.shape, array.dtype.str, digest)
+
+
+# Les figures sont mémorisées tant que leurs entrées ne changent pas ; le
+# nombre d'entrées est borné pour ne pas accumuler de vieilles figures
+_FIGURE_HASH_FUNCS = {np.ndarray: _hash_array}
+FIGURE_CACHE_MAX_ENTRIES = 8
+
+# Nombre de points Monte Carlo intérieurs envoyés au navigateur
+SCATTER_MAX_POINTS = 2000
+
+
+def _downsample_scatter(
+    volatilities: np.ndarray,
+    returns: np.ndarray,
+    max_points: int = SCATTER_MAX_POINTS
+) -> np.ndarray:
+    """
+    Indices (triés) des points du nuage à tracer : tous les points
+    Pareto-optimaux (volatilité ↓, rendement ↑) plus un sous-échantillon
+    aléatoire reproductible de max_points points.
+    """
+    n = len(volatilities)
+    if n <= max_points:
+        return np.arange(n)
+    
+    # Pareto : tri par volatilité, rendement strictement supérieur au maximum courant
+    order = np.argsort(volatilities, kind='stable')
+    sorted_returns = returns[order]
+    previous_max = np.maximum.accumulate(sorted_returns)
+    pareto = np.ones(n, dtype=bool)
+    pareto[1:] = sorted_returns[1:] > previous_max[:-1]
+    
+    rng = np.random.default_rng(0)
+    sample = rng.choice(n, size=max_points, replace=False)
+    return np.union1d(order[pareto], sample)
+
 
+# Base layout configuration for Gotham theme (construite une seule fois)
+_GOTHAM_LAYOUT = dict(
+    plot_bgcolor=GOTHAM['bg_primary'],
+    paper_bgcolor=GOTHAM['bg_secondary'],
+    font=dict(
+        family="JetBrains Mono, Roboto Mono, monospace",
+        color=GOTHAM['text_primary'],
+        size=11
+    ),
+    margin=dict(l=50, r=30, t=60, b=50),
+)
 
+# Styles d'axes partagés, fusionnés par copie superficielle dans chaque figure
+_AXIS_LINE_STYLE = dict(
+    showline=True,
+    linewidth=1,
+    linecolor=GOTHAM['border']
+)
+
+_TICKER_AXIS_STYLE = dict(
+    tickfont=dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
+    **_AXIS_LINE_STYLE
+)
+
+_CATEGORY_XAXIS_STYLE = dict(
+    title=None,
+    showgrid=False,
+    **_TICKER_AXIS_STYLE
+)
+
+_VALUE_YAXIS_STYLE = dict(
+    tickfont=dict(color=GOTHAM['text_secondary'], size=9),
+    showgrid=False,
+    **_AXIS_LINE_STYLE
+)
+
+_GRID_AXIS_STYLE = dict(
+    tickfont=dict(color=GOTHAM['text_secondary'], size=9),
+    gridcolor=GOTHAM['grid_faint'],
+    gridwidth=1,
+    griddash='dot',
+    zerolinecolor=GOTHAM['border'],
+    **_AXIS_LINE_STYLE
+)
+
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs=_FIGURE_HASH_FUNCS,
+    max_entries=FIGURE_CACHE_MAX_ENTRIES
+)
 def create_efficient_frontier(
     simulation_results,
     optimal_portfolios: Dict,
-    tickers: list
+    tickers: list,
+    frontier=None
 ) -> go.Figure:
     """
     Crée le graphique de la Frontière Efficiente - Style Gotham.
+    
+    Le nuage Monte Carlo et la courbe analytique sont optionnels (None).
     """
     fig = go.Figure()
     
-    # Nuage de points des simulations
-    fig.add_trace(go.Scatter(
-        x=simulation_results.volatilities * 100,
-        y=simulation_results.returns * 100,
-        mode='markers',
-        marker=dict(
-            size=3,
-            color=simulation_results.sharpe_ratios,
-            colorscale=[
-                [0, '#1a1f2e'],
-                [0.5, '#00A3FF'],
-                [1, '#00FF88']
-            ],
-            colorbar=dict(
-                title=dict(
-                    text='SHARPE',
-                    font=dict(color=GOTHAM['text_secondary'], size=10)
+    # Nuage de points des simulations (WebGL), réduit à l'enveloppe et un échantillon
+    if simulation_results is not None:
+        sharpe_ratios = simulation_results.sharpe_ratios
+        kept = _downsample_scatter(
+            simulation_results.volatilities,
+            simulation_results.returns
+        )
+        fig.add_trace(go.Scattergl(
+            x=simulation_results.volatilities[kept] * 100,
+            y=simulation_results.returns[kept] * 100,
+            mode='markers',
+            marker=dict(
+                size=3,
+                color=sharpe_ratios[kept],
+                cmin=float(sharpe_ratios.min()),
+                cmax=float(sharpe_ratios.max()),
+                colorscale=[
+                    [0, '#1a1f2e'],
+                    [0.5, '#00A3FF'],
+                    [1, '#00FF88']
+                ],
+                colorbar=dict(
+                    title=dict(
+                        text='SHARPE',
+                        font=dict(color=GOTHAM['text_secondary'], size=10)
+                    ),
+                    tickfont=dict(color=GOTHAM['text_secondary'], size=9),
+                    thickness=10,
+                    len=0.6,
+                    bgcolor=GOTHAM['bg_secondary'],
+                    bordercolor=GOTHAM['border'],
+                    borderwidth=1
                 ),
-                tickfont=dict(color=GOTHAM['text_secondary'], size=9),
-                thickness=10,
-                len=0.6,
-                bgcolor=GOTHAM['bg_secondary'],
-                bordercolor=GOTHAM['border'],
-                borderwidth=1
+                opacity=0.6,
+                line=dict(width=0)
             ),
-            opacity=0.6,
-            line=dict(width=0)
-        ),
-        hovertemplate=(
-            '<b>σ:</b> %{x:.2f}%<br>'
-            '<b>μ:</b> %{y:.2f}%<extra></extra>'
-        ),
-        name='SIMULATIONS'
-    ))
+            hovertemplate=(
+                '<b>σ:</b> %{x:.2f}%<br>'
+                '<b>μ:</b> %{y:.2f}%<extra></extra>'
+            ),
+            name='SIMULATIONS'
+        ))
+    
+    # Frontière efficiente analytique
+    if frontier is not None:
+        fig.add_trace(go.Scatter(
+            x=frontier.volatilities * 100,
+            y=frontier.returns * 100,
+            mode='lines',
+            line=dict(color=GOTHAM['accent_cyan'], width=2),
+            hovertemplate=(
+                '<b>σ:</b> %{x:.2f}%<br>'
+                '<b>μ:</b> %{y:.2f}%<extra></extra>'
+            ),
+            name='EFFICIENT FRONTIER'
+        ))
     
     # Portefeuille Max Sharpe
     max_sharpe = optimal_portfolios['max_sharpe']
@@ -137,34 +241,20 @@ def create_efficient_frontier(
     
     # Layout Gotham
     fig.update_layout(
-        **_get_gotham_layout(),
+        **_GOTHAM_LAYOUT,
         title=dict(
             text='<b>EFFICIENT FRONTIER</b>',
             font=dict(size=14, color=GOTHAM['text_primary']),
             x=0.5
         ),
-        xaxis=dict(
-            title=dict(text='VOLATILITY (σ %)', font=dict(color=GOTHAM['text_secondary'], size=10)),
-            tickfont=dict(color=GOTHAM['text_secondary'], size=9),
-            gridcolor=GOTHAM['grid_faint'],
-            gridwidth=1,
-            griddash='dot',
-            zerolinecolor=GOTHAM['border'],
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
-        yaxis=dict(
-            title=dict(text='RETURN (μ %)', font=dict(color=GOTHAM['text_secondary'], size=10)),
-            tickfont=dict(color=GOTHAM['text_secondary'], size=9),
-            gridcolor=GOTHAM['grid_faint'],
-            gridwidth=1,
-            griddash='dot',
-            zerolinecolor=GOTHAM['border'],
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
+        xaxis={
+            **_GRID_AXIS_STYLE,
+            'title': dict(text='VOLATILITY (σ %)', font=dict(color=GOTHAM['text_secondary'], size=10))
+        },
+        yaxis={
+            **_GRID_AXIS_STYLE,
+            'title': dict(text='RETURN (μ %)', font=dict(color=GOTHAM['text_secondary'], size=10))
+        },
         legend=dict(
             font=dict(color=GOTHAM['text_secondary'], size=9),
             bgcolor='rgba(20,23,34,0.9)',
@@ -179,15 +269,32 @@ def create_efficient_frontier(
     return fig
 
 
-def create_allocation_chart(weights: Dict, portfolio_name: str) -> go.Figure:
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs=_FIGURE_HASH_FUNCS,
+    max_entries=FIGURE_CACHE_MAX_ENTRIES
+)
+def create_allocation_chart(
+    tickers: list,
+    weights: np.ndarray,
+    portfolio_name: str
+) -> go.Figure:
     """
     Graphique en barres de l'allocation - Style Gotham.
     """
-    tickers = list(weights.keys())
-    values = [w * 100 for w in weights.values()]
+    values = (np.asarray(weights) * 100).tolist()
     
-    # Couleurs basées sur la valeur
-    colors = [GOTHAM['accent_blue'] if v > 15 else GOTHAM['accent_cyan'] for v in values]
+    # Libellés, couleurs (positions courtes en rouge) et bornes en une passe
+    labels, colors = [], []
+    lo, hi = 0.0, -np.inf
+    for v in values:
+        labels.append(f'{v:.1f}%')
+        colors.append(
+            GOTHAM['alert_red'] if v < 0
+            else GOTHAM['accent_blue'] if v > 15
+            else GOTHAM['accent_cyan']
+        )
+        lo, hi = min(lo, v), max(hi, v)
     
     fig = go.Figure()
     
@@ -198,36 +305,25 @@ def create_allocation_chart(weights: Dict, portfolio_name: str) -> go.Figure:
             color=colors,
             line=dict(width=1, color=GOTHAM['border'])
         ),
-        text=[f'{v:.1f}%' for v in values],
+        text=labels,
         textposition='outside',
         textfont=dict(color=GOTHAM['accent_blue'], size=10, family='JetBrains Mono'),
         hovertemplate='<b>%{x}</b><br>WEIGHT: %{y:.2f}%<extra></extra>'
     ))
     
     fig.update_layout(
-        **_get_gotham_layout(),
+        **_GOTHAM_LAYOUT,
         title=dict(
             text=f'<b>ALLOCATION — {portfolio_name.upper()}</b>',
             font=dict(size=12, color=GOTHAM['text_primary']),
             x=0.5
         ),
-        xaxis=dict(
-            title=None,
-            tickfont=dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
-            showgrid=False,
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
-        yaxis=dict(
-            title=dict(text='WEIGHT %', font=dict(color=GOTHAM['text_secondary'], size=9)),
-            tickfont=dict(color=GOTHAM['text_secondary'], size=9),
-            showgrid=False,
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border'],
-            range=[0, max(values) * 1.25]
-        ),
+        xaxis=_CATEGORY_XAXIS_STYLE,
+        yaxis={
+            **_VALUE_YAXIS_STYLE,
+            'title': dict(text='WEIGHT %', font=dict(color=GOTHAM['text_secondary'], size=9)),
+            'range': [lo * 1.25, hi * 1.25]
+        },
         height=340,
         showlegend=False,
         bargap=0.3
@@ -236,31 +332,38 @@ def create_allocation_chart(weights: Dict, portfolio_name: str) -> go.Figure:
     return fig
 
 
-def create_correlation_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs=_FIGURE_HASH_FUNCS,
+    max_entries=FIGURE_CACHE_MAX_ENTRIES
+)
+def create_correlation_heatmap(tickers: list, corr_matrix: np.ndarray) -> go.Figure:
     """
     Heatmap de corrélation - Style Gotham.
     """
-    # Annotations
-    annotations = []
-    for i, row in enumerate(corr_matrix.index):
-        for j, col in enumerate(corr_matrix.columns):
-            val = corr_matrix.iloc[i, j]
-            annotations.append(dict(
-                x=col,
-                y=row,
-                text=f'{val:.2f}',
-                font=dict(
-                    color=GOTHAM['text_primary'] if abs(val) > 0.5 else GOTHAM['text_secondary'],
-                    size=10,
-                    family='JetBrains Mono'
-                ),
-                showarrow=False
-            ))
+    # Annotations : textes et couleurs formatés en bloc sur le ndarray
+    n = len(tickers)
+    texts = np.char.mod('%.2f', corr_matrix).ravel().tolist()
+    strong = (np.abs(corr_matrix) > 0.5).ravel().tolist()
+    fonts = {
+        True: dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
+        False: dict(color=GOTHAM['text_secondary'], size=10, family='JetBrains Mono')
+    }
+    annotations = [
+        dict(
+            x=tickers[k % n],
+            y=tickers[k // n],
+            text=texts[k],
+            font=fonts[strong[k]],
+            showarrow=False
+        )
+        for k in range(n * n)
+    ]
     
     fig = go.Figure(data=go.Heatmap(
-        z=corr_matrix.values,
-        x=corr_matrix.columns,
-        y=corr_matrix.index,
+        z=corr_matrix,
+        x=tickers,
+        y=tickers,
         colorscale=[
             [0, GOTHAM['alert_red']],
             [0.5, GOTHAM['bg_primary']],
@@ -281,26 +384,14 @@ def create_correlation_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
     ))
     
     fig.update_layout(
-        **_get_gotham_layout(),
+        **_GOTHAM_LAYOUT,
         title=dict(
             text='<b>CORRELATION MATRIX</b>',
             font=dict(size=12, color=GOTHAM['text_primary']),
             x=0.5
         ),
-        xaxis=dict(
-            tickfont=dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
-            side='bottom',
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
-        yaxis=dict(
-            tickfont=dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
-            autorange='reversed',
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
+        xaxis={**_TICKER_AXIS_STYLE, 'side': 'bottom'},
+        yaxis={**_TICKER_AXIS_STYLE, 'autorange': 'reversed'},
         height=400,
         annotations=annotations
     )
@@ -308,14 +399,22 @@ def create_correlation_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_individual_returns_chart(annual_returns: pd.Series) -> go.Figure:
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs=_FIGURE_HASH_FUNCS,
+    max_entries=FIGURE_CACHE_MAX_ENTRIES
+)
+def create_individual_returns_chart(tickers: list, annual_returns: np.ndarray) -> go.Figure:
     """
     Graphique des rendements individuels - Style Gotham.
     """
-    tickers = annual_returns.index.tolist()
-    values = [r * 100 for r in annual_returns.values]
+    values = (np.asarray(annual_returns) * 100).tolist()
     
-    colors = [GOTHAM['success_green'] if v >= 0 else GOTHAM['alert_red'] for v in values]
+    # Libellés et couleurs en une passe
+    labels, colors = [], []
+    for v in values:
+        labels.append(f'{v:+.1f}%')
+        colors.append(GOTHAM['success_green'] if v >= 0 else GOTHAM['alert_red'])
     
     fig = go.Figure()
     
@@ -326,7 +425,7 @@ def create_individual_returns_chart(annual_returns: pd.Series) -> go.Figure:
             color=colors,
             line=dict(width=1, color=GOTHAM['border'])
         ),
-        text=[f'{v:+.1f}%' for v in values],
+        text=labels,
         textposition='outside',
         textfont=dict(color=GOTHAM['text_secondary'], size=9, family='JetBrains Mono'),
         hovertemplate='<b>%{x}</b><br>RETURN: %{y:.2f}%<extra></extra>'
@@ -339,28 +438,17 @@ def create_individual_returns_chart(annual_returns: pd.Series) -> go.Figure:
     )
     
     fig.update_layout(
-        **_get_gotham_layout(),
+        **_GOTHAM_LAYOUT,
         title=dict(
             text='<b>ANNUALIZED RETURNS</b>',
             font=dict(size=12, color=GOTHAM['text_primary']),
             x=0.5
         ),
-        xaxis=dict(
-            title=None,
-            tickfont=dict(color=GOTHAM['text_primary'], size=10, family='JetBrains Mono'),
-            showgrid=False,
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
-        yaxis=dict(
-            title=dict(text='RETURN %', font=dict(color=GOTHAM['text_secondary'], size=9)),
-            tickfont=dict(color=GOTHAM['text_secondary'], size=9),
-            showgrid=False,
-            showline=True,
-            linewidth=1,
-            linecolor=GOTHAM['border']
-        ),
+        xaxis=_CATEGORY_XAXIS_STYLE,
+        yaxis={
+            **_VALUE_YAXIS_STYLE,
+            'title': dict(text='RETURN %', font=dict(color=GOTHAM['text_secondary'], size=9))
+        },
         height=300,
         showlegend=False,
         bargap=0.3